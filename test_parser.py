@@ -4,6 +4,13 @@
 """
 import struct
 
+# 预编译的 struct 格式（HID 短项数据最多 4 字节）
+_U16BE = struct.Struct('>H')
+_S16BE = struct.Struct('>h')
+_U32BE = struct.Struct('>I')
+_S32BE = struct.Struct('>i')
+_U16BE_PAIR = struct.Struct('>HH')
+
 # HID 描述符数据（从终端输出复制）
 descriptor_hex = """
 05 01 09 02 A1 01 85 02 09 01 A1 00 05 09 19 01 
@@ -18,72 +25,40 @@ A1 01 85 08 19 01 29 FF 15 01 26 FF 00 75 08 95
 01 81 00 C0
 """
 
-def parse_hex(hex_str):
-    """将十六进制字符串转换为字节数组"""
-    return bytes.fromhex(hex_str.replace('\n', ' ').strip())
+_DESCRIPTOR_BYTES = bytes.fromhex(descriptor_hex)
 
-def parse_hid_item(descriptor, offset):
-    """解析单个 HID 项"""
-    if offset >= len(descriptor):
-        return None, offset
-    
-    b = descriptor[offset]
-    offset += 1
-    
-    # Long item
-    if b == 0xFE:
-        if offset >= len(descriptor):
-            return None, offset
-        data_size = descriptor[offset]
-        offset += 1
-        long_data_size = descriptor[offset]
-        offset += 1
-        offset += long_data_size
-        return {'type': 'LONG', 'data': descriptor[offset-long_data_size:offset]}, offset
-    
-    # Short item
-    item_size = b & 0x03
-    if item_size == 3:
-        item_size = 4
-    
-    item_type = (b >> 2) & 0x03
-    item_tag = (b >> 4) & 0x0F
-    
-    if offset + item_size > len(descriptor):
-        return None, offset
-    
-    data = descriptor[offset:offset+item_size]
-    offset += item_size
-    
-    return {
-        'byte': b,
-        'type': item_type,
-        'tag': item_tag,
-        'size': item_size,
-        'data': data
-    }, offset
+def parse_hex(hex_str):
+    """将十六进制字符串转换为字节数组（fromhex 本身会跳过空白和换行）"""
+    return bytes.fromhex(hex_str)
 
 def decode_uint(data, signed=False):
-    """解码无符号/有符号整数"""
-    if len(data) == 0:
+    """解码无符号/有符号整数
+
+    描述符中绝大多数项只有 1 字节数据，直接取 data[0]；2/4 字节走预编译 Struct
+    （实测 CPython 3.11 上 int.from_bytes 比 Struct 慢）。
+    """
+    n = len(data)
+    if n == 1:
+        v = data[0]
+        return v - 256 if signed and v >= 128 else v
+    if n == 0:
         return 0
-    if len(data) == 1:
-        return struct.unpack('b' if signed else 'B', data)[0]
-    if len(data) == 2:
-        return struct.unpack('>h' if signed else '>H', data)[0]
-    if len(data) == 4:
-        return struct.unpack('>i' if signed else '>I', data)[0]
+    if n == 2:
+        return (_S16BE if signed else _U16BE).unpack(data)[0]
+    if n == 4:
+        return (_S32BE if signed else _U32BE).unpack(data)[0]
     return 0
 
 def decode_usage(data):
     """解码 Usage 值（可能是 1, 2 或 4 字节）"""
-    if len(data) == 1:
+    n = len(data)
+    if n == 1:
         return (0, data[0])
-    elif len(data) == 2:
-        return (0, struct.unpack('>H', data)[0])
-    elif len(data) == 4:
-        usage_page = struct.unpack('>H', data[2:4])[0]
-        usage = struct.unpack('>H', data[0:2])[0]
+    elif n == 2:
+        return (0, _U16BE.unpack(data)[0])
+    elif n == 4:
+        # 一次解出两个 16 位字段，比两次 unpack_from 少一次调用
+        usage, usage_page = _U16BE_PAIR.unpack(data)
         return (usage_page, usage)
     return (0, 0)
 
@@ -124,257 +99,392 @@ USAGE_Y = 0x31
 USAGE_WHEEL = 0x38
 USAGE_CONSUMER_AC_PAN = 0x0238
 
-def parse_descriptor(descriptor):
-    """解析 HID 描述符并提取鼠标布局信息"""
+class Layout:
+    """单个报告 ID 的鼠标字段布局"""
+    __slots__ = (
+        'report_id',
+        'buttons_bit_offset',
+        'buttons_count',
+        'x_bit_offset',
+        'x_size',
+        'y_bit_offset',
+        'y_size',
+        'wheel_bit_offset',
+        'wheel_size',
+        'pan_bit_offset',
+        'pan_size',
+        'current_bit_offset',
+    )
+
+    def __init__(self, report_id):
+        self.report_id = report_id
+        self.buttons_bit_offset = 0
+        self.buttons_count = 0
+        self.x_bit_offset = 0
+        self.x_size = 0
+        self.y_bit_offset = 0
+        self.y_size = 0
+        self.wheel_bit_offset = 0
+        self.wheel_size = 0
+        self.pan_bit_offset = 0
+        self.pan_size = 0
+        self.current_bit_offset = 0
+
+class ParserState:
+    """描述符解析过程中的全局/局部状态"""
+    __slots__ = (
+        'usage_page',
+        'report_id',
+        'report_size',
+        'report_count',
+        'logical_min',
+        'logical_max',
+        'usages',
+        'mouse_usage_count',
+        'usage_min',
+        'usage_max',
+        'collection_depth',
+        'in_mouse_collection',
+        'current_bit_offset',
+        'layouts',
+        'current_layout',
+        'trace',
+    )
+
+    def __init__(self):
+        self.usage_page = 0
+        self.report_id = 0
+        self.report_size = 0
+        self.report_count = 0
+        self.logical_min = 0
+        self.logical_max = 0
+        self.usages = []
+        # usages 中 (Generic Desktop, Mouse) 的个数，COLLECTION 时据此判断鼠标集合
+        self.mouse_usage_count = 0
+        self.usage_min = None
+        self.usage_max = None
+        self.collection_depth = 0
+        self.in_mouse_collection = False
+        self.current_bit_offset = 0
+        self.layouts = {}
+        self.current_layout = None
+        self.trace = None
+
+# (usage_page, usage) -> (Layout 偏移属性, Layout 大小属性, 显示名称)
+_FIELD_MAP = {
+    (PAGE_GENERIC_DESKTOP, USAGE_X): ('x_bit_offset', 'x_size', "X axis"),
+    (PAGE_GENERIC_DESKTOP, USAGE_Y): ('y_bit_offset', 'y_size', "Y axis"),
+    (PAGE_GENERIC_DESKTOP, USAGE_WHEEL): ('wheel_bit_offset', 'wheel_size', "Wheel"),
+    (PAGE_CONSUMER, USAGE_CONSUMER_AC_PAN): ('pan_bit_offset', 'pan_size', "Pan"),
+}
+
+# 项信息行的模板，数据字节在格式化阶段才转换为十六进制
+_ITEM_LINE = "[{:04X}] {:15} [{:02X}] data={}"
+
+# 短项前缀字节 -> (size, type, tag, byte & 0xFC)，预先算好免去每项的位运算
+_ITEM_HEADER = [
+    ((b & 0x03) if (b & 0x03) != 3 else 4, (b >> 2) & 0x03, (b >> 4) & 0x0F, b & 0xFC)
+    for b in range(256)
+]
+
+# 项前缀（byte & 0xFC）-> 显示名称
+_ITEM_NAMES = {
+    MAIN_INPUT: "INPUT",
+    MAIN_OUTPUT: "OUTPUT",
+    MAIN_FEATURE: "FEATURE",
+    MAIN_COLLECTION: "COLLECTION",
+    MAIN_END_COLLECTION: "END_COLLECTION",
+    GLOBAL_USAGE_PAGE: "USAGE_PAGE",
+    GLOBAL_LOGICAL_MIN: "LOGICAL_MIN",
+    GLOBAL_LOGICAL_MAX: "LOGICAL_MAX",
+    GLOBAL_REPORT_SIZE: "REPORT_SIZE",
+    GLOBAL_REPORT_ID: "REPORT_ID",
+    GLOBAL_REPORT_COUNT: "REPORT_COUNT",
+    LOCAL_USAGE: "USAGE",
+    LOCAL_USAGE_MIN: "USAGE_MIN",
+    LOCAL_USAGE_MAX: "USAGE_MAX",
+}
+
+def _global_usage_page(state, data):
+    state.usage_page = decode_uint(data)
+    if state.trace is not None:
+        state.trace.append((" -> Usage Page: 0x{:04X}\n", (state.usage_page,)))
+
+def _global_logical_min(state, data):
+    state.logical_min = decode_uint(data, signed=True)
+    if state.trace is not None:
+        state.trace.append((" -> Logical Min: {}\n", (state.logical_min,)))
+
+def _global_logical_max(state, data):
+    state.logical_max = decode_uint(data, signed=True)
+    if state.trace is not None:
+        state.trace.append((" -> Logical Max: {}\n", (state.logical_max,)))
+
+def _global_report_size(state, data):
+    state.report_size = decode_uint(data)
+    if state.trace is not None:
+        state.trace.append((" -> Report Size: {} bits\n", (state.report_size,)))
+
+def _global_report_id(state, data):
+    state.report_id = decode_uint(data)
+    if state.trace is not None:
+        state.trace.append((" -> Report ID: {}\n", (state.report_id,)))
+    # 切换到新的报告布局
+    layout = state.layouts.get(state.report_id)
+    if layout is None:
+        layout = Layout(state.report_id)
+        state.layouts[state.report_id] = layout
+    state.current_layout = layout
+    state.current_bit_offset = 0
+
+def _global_report_count(state, data):
+    state.report_count = decode_uint(data)
+    if state.trace is not None:
+        state.trace.append((" -> Report Count: {}\n", (state.report_count,)))
+
+def _local_usage(state, data):
+    usage_page, usage = decode_usage(data)
+    if usage_page == 0:
+        usage_page = state.usage_page
+    state.usages.append((usage_page, usage, usage))
+    if usage_page == PAGE_GENERIC_DESKTOP and usage == USAGE_MOUSE:
+        state.mouse_usage_count += 1
+    if state.trace is not None:
+        state.trace.append((" -> Usage: Page=0x{:04X}, Usage=0x{:04X}\n", (usage_page, usage)))
+
+def _local_usage_min(state, data):
+    usage_page, usage = decode_usage(data)
+    if usage_page == 0:
+        usage_page = state.usage_page
+    state.usage_min = (usage_page, usage)
+    if state.trace is not None:
+        state.trace.append((" -> Usage Min: Page=0x{:04X}, Usage=0x{:04X}\n", (usage_page, usage)))
+
+def _local_usage_max(state, data):
+    usage_page, usage = decode_usage(data)
+    if usage_page == 0:
+        usage_page = state.usage_page
+    if state.usage_min:
+        min_page, min_usage = state.usage_min
+        if min_page == usage_page:
+            state.usages.append((usage_page, min_usage, usage))
+            if usage_page == PAGE_GENERIC_DESKTOP and min_usage == USAGE_MOUSE:
+                state.mouse_usage_count += 1
+            if state.trace is not None:
+                state.trace.append((" -> Usage Max: Page=0x{:04X}, Usage=0x{:04X} (range: 0x{:04X}-0x{:04X})\n",
+                                    (usage_page, usage, min_usage, usage)))
+        state.usage_min = None
+    else:
+        state.usages.append((usage_page, usage, usage))
+        if usage_page == PAGE_GENERIC_DESKTOP and usage == USAGE_MOUSE:
+            state.mouse_usage_count += 1
+        if state.trace is not None:
+            state.trace.append((" -> Usage Max: Page=0x{:04X}, Usage=0x{:04X}\n", (usage_page, usage)))
+
+# 项前缀 -> 状态更新函数
+_GLOBAL_HANDLERS = {
+    GLOBAL_USAGE_PAGE: _global_usage_page,
+    GLOBAL_LOGICAL_MIN: _global_logical_min,
+    GLOBAL_LOGICAL_MAX: _global_logical_max,
+    GLOBAL_REPORT_SIZE: _global_report_size,
+    GLOBAL_REPORT_ID: _global_report_id,
+    GLOBAL_REPORT_COUNT: _global_report_count,
+}
+
+_LOCAL_HANDLERS = {
+    LOCAL_USAGE: _local_usage,
+    LOCAL_USAGE_MIN: _local_usage_min,
+    LOCAL_USAGE_MAX: _local_usage_max,
+}
+
+def _print_trace(trace):
+    """格式化并输出解析过程中记录的 (模板, 参数) 事件"""
+    for fmt, args in trace:
+        if fmt is _ITEM_LINE:
+            item_offset, item_name, item_byte, item_data = args
+            args = (item_offset, item_name, item_byte, item_data.hex(' ').upper())
+        print(fmt.format(*args), end='')
+
+def _print_layouts(layouts):
+    """输出各报告 ID 的解析结果"""
+    print("\n=== 解析结果 ===\n")
+    for report_id, layout in sorted(layouts.items()):
+        print(f"Report ID {report_id}:")
+        print(f"  Buttons: offset={layout.buttons_bit_offset}, count={layout.buttons_count}")
+        print(f"  X: offset={layout.x_bit_offset}, size={layout.x_size}")
+        print(f"  Y: offset={layout.y_bit_offset}, size={layout.y_size}")
+        print(f"  Wheel: offset={layout.wheel_bit_offset}, size={layout.wheel_size}")
+        print(f"  Pan: offset={layout.pan_bit_offset}, size={layout.pan_size}")
+        print(f"  Total bits: {layout.current_bit_offset}")
+        print()
+
+def parse_descriptor(descriptor, verbose=False):
+    """解析 HID 描述符并提取鼠标布局信息
+
+    verbose 为 True 时记录每一项的解析过程，解析结束后统一格式化输出；
+    为 False 时不做任何字符串格式化和输出。
+    """
     offset = 0
-    state = {
-        'usage_page': 0,
-        'report_id': 0,
-        'report_size': 0,
-        'report_count': 0,
-        'logical_min': 0,
-        'logical_max': 0,
-        'usages': [],
-        'usage_min': None,
-        'usage_max': None,
-        'collection_depth': 0,
-        'in_mouse_collection': False,
-        'current_bit_offset': 0,
-        'layouts': {}
-    }
+    state = ParserState()
+    trace = [] if verbose else None
+    state.trace = trace
     
-    print("=== 解析 HID 描述符 ===\n")
-    
-    while offset < len(descriptor):
-        item, offset = parse_hid_item(descriptor, offset)
-        if item is None:
-            break
-        
-        if item.get('type') == 'LONG':
-            print(f"[{offset-len(item['data'])-2:04X}] LONG item, size={len(item['data'])}")
-            continue
-        
-        item_byte = item['byte']
-        item_type = item['type']
-        item_tag = item['tag']
-        item_data = item['data']
-        
-        # 打印项信息
-        item_name = "UNKNOWN"
-        if item_type == ITEM_TYPE_MAIN:
-            if item_tag == 0x8: item_name = "INPUT"
-            elif item_tag == 0x9: item_name = "OUTPUT"
-            elif item_tag == 0xB: item_name = "FEATURE"
-            elif item_tag == 0xA: item_name = "COLLECTION"
-            elif item_tag == 0xC: item_name = "END_COLLECTION"
-        elif item_type == ITEM_TYPE_GLOBAL:
-            if item_tag == 0x0: item_name = "USAGE_PAGE"
-            elif item_tag == 0x1: item_name = "LOGICAL_MIN"
-            elif item_tag == 0x2: item_name = "LOGICAL_MAX"
-            elif item_tag == 0x7: item_name = "REPORT_SIZE"
-            elif item_tag == 0x8: item_name = "REPORT_ID"
-            elif item_tag == 0x9: item_name = "REPORT_COUNT"
-        elif item_type == ITEM_TYPE_LOCAL:
-            if item_tag == 0x0: item_name = "USAGE"
-            elif item_tag == 0x1: item_name = "USAGE_MIN"
-            elif item_tag == 0x2: item_name = "USAGE_MAX"
-        
-        data_str = ' '.join(f'{b:02X}' for b in item_data)
-        print(f"[{offset-len(item_data)-1:04X}] {item_name:15} [{item_byte:02X}] data={data_str}", end='')
-        
-        # 处理全局项
-        if item_type == ITEM_TYPE_GLOBAL:
-            if item_tag == 0x0:  # USAGE_PAGE
-                state['usage_page'] = decode_uint(item_data)
-                print(f" -> Usage Page: 0x{state['usage_page']:04X}")
-            elif item_tag == 0x1:  # LOGICAL_MIN
-                state['logical_min'] = decode_uint(item_data, signed=True)
-                print(f" -> Logical Min: {state['logical_min']}")
-            elif item_tag == 0x2:  # LOGICAL_MAX
-                state['logical_max'] = decode_uint(item_data, signed=True)
-                print(f" -> Logical Max: {state['logical_max']}")
-            elif item_tag == 0x7:  # REPORT_SIZE
-                state['report_size'] = decode_uint(item_data)
-                print(f" -> Report Size: {state['report_size']} bits")
-            elif item_tag == 0x8:  # REPORT_ID
-                state['report_id'] = decode_uint(item_data)
-                print(f" -> Report ID: {state['report_id']}")
-                # 切换到新的报告布局
-                if state['report_id'] not in state['layouts']:
-                    state['layouts'][state['report_id']] = {
-                        'report_id': state['report_id'],
-                        'buttons_bit_offset': 0,
-                        'buttons_count': 0,
-                        'x_bit_offset': 0,
-                        'x_size': 0,
-                        'y_bit_offset': 0,
-                        'y_size': 0,
-                        'wheel_bit_offset': 0,
-                        'wheel_size': 0,
-                        'pan_bit_offset': 0,
-                        'pan_size': 0,
-                        'current_bit_offset': 0
-                    }
-                state['current_bit_offset'] = 0
-            elif item_tag == 0x9:  # REPORT_COUNT
-                state['report_count'] = decode_uint(item_data)
-                print(f" -> Report Count: {state['report_count']}")
-            else:
-                print()
-        
-        # 处理局部项
-        elif item_type == ITEM_TYPE_LOCAL:
-            if item_tag == 0x0:  # USAGE
-                usage_page, usage = decode_usage(item_data)
-                if usage_page == 0:
-                    usage_page = state['usage_page']
-                state['usages'].append((usage_page, usage, usage))
-                print(f" -> Usage: Page=0x{usage_page:04X}, Usage=0x{usage:04X}")
-            elif item_tag == 0x1:  # USAGE_MIN
-                usage_page, usage = decode_usage(item_data)
-                if usage_page == 0:
-                    usage_page = state['usage_page']
-                state['usage_min'] = (usage_page, usage)
-                print(f" -> Usage Min: Page=0x{usage_page:04X}, Usage=0x{usage:04X}")
-            elif item_tag == 0x2:  # USAGE_MAX
-                usage_page, usage = decode_usage(item_data)
-                if usage_page == 0:
-                    usage_page = state['usage_page']
-                if state['usage_min']:
-                    min_page, min_usage = state['usage_min']
-                    if min_page == usage_page:
-                        state['usages'].append((usage_page, min_usage, usage))
-                        print(f" -> Usage Max: Page=0x{usage_page:04X}, Usage=0x{usage:04X} (range: 0x{min_usage:04X}-0x{usage:04X})")
-                    state['usage_min'] = None
-                else:
-                    state['usages'].append((usage_page, usage, usage))
-                    print(f" -> Usage Max: Page=0x{usage_page:04X}, Usage=0x{usage:04X}")
-            else:
-                print()
-        
-        # 处理主项
-        elif item_type == ITEM_TYPE_MAIN:
-            if item_tag == 0xA:  # COLLECTION
-                collection_type = item_data[0] if len(item_data) > 0 else 0
-                state['collection_depth'] += 1
-                print(f" -> Collection Type: {collection_type}")
-                # 检查是否是鼠标集合
-                for usage_page, usage_min, usage_max in state['usages']:
-                    if usage_page == PAGE_GENERIC_DESKTOP and usage_min == USAGE_MOUSE:
-                        state['in_mouse_collection'] = True
-                        print(f"    -> Found MOUSE collection!")
-            elif item_tag == 0xC:  # END_COLLECTION
-                state['collection_depth'] -= 1
-                if state['collection_depth'] == 0:
-                    state['in_mouse_collection'] = False
-                print(f" -> End Collection (depth={state['collection_depth']})")
-            elif item_tag == 0x8:  # INPUT
-                flags = decode_uint(item_data)
-                is_variable = (flags & 0x02) != 0
-                is_relative = (flags & 0x01) != 0
-                bit_size = state['report_size'] * state['report_count']
-                
-                print(f" -> INPUT: flags=0x{flags:02X}, variable={is_variable}, relative={is_relative}, bit_size={bit_size}, bit_offset={state['current_bit_offset']}")
-                
-                # 处理 usages
-                layout = state['layouts'].get(state['report_id'], None)
-                if layout is None:
-                    layout = {
-                        'report_id': state['report_id'],
-                        'buttons_bit_offset': 0,
-                        'buttons_count': 0,
-                        'x_bit_offset': 0,
-                        'x_size': 0,
-                        'y_bit_offset': 0,
-                        'y_size': 0,
-                        'wheel_bit_offset': 0,
-                        'wheel_size': 0,
-                        'pan_bit_offset': 0,
-                        'pan_size': 0,
-                        'current_bit_offset': 0
-                    }
-                    state['layouts'][state['report_id']] = layout
-                
-                # 处理每个 usage
-                # 对于 variable 字段，每个 usage 对应 report_count 中的一项
-                usage_index = 0
-                for usage_page, usage_min, usage_max in state['usages']:
-                    print(f"    -> Processing usage[{usage_index}]: Page=0x{usage_page:04X}, Range=0x{usage_min:04X}-0x{usage_max:04X}")
-                    
-                    # 计算该 usage 的位偏移
-                    field_bit_offset = state['current_bit_offset']
-                    if is_variable and usage_index < state['report_count']:
-                        field_bit_offset = state['current_bit_offset'] + (usage_index * state['report_size'])
-                        print(f"       -> Variable field: usage_index={usage_index}, field_bit_offset={field_bit_offset}")
+    # 出错时也先输出已记录的部分，便于排查畸形描述符
+    try:
+        descriptor_len = len(descriptor)
+        while offset < descriptor_len:
+            item_byte = descriptor[offset]
+            offset += 1
+            
+            # Long item
+            if item_byte == 0xFE:
+                if offset >= descriptor_len:
+                    break
+                long_data_size = descriptor[offset + 1]
+                offset += 2 + long_data_size
+                if trace is not None:
+                    item_size = len(descriptor[offset-long_data_size:offset])
+                    trace.append(("[{:04X}] LONG item, size={}\n", (offset-item_size-2, item_size)))
+                continue
+            
+            # Short item
+            item_size, item_type, item_tag, item_prefix = _ITEM_HEADER[item_byte]
+            
+            if offset + item_size > descriptor_len:
+                break
+            
+            item_data = descriptor[offset:offset+item_size]
+            offset += item_size
+            
+            # 记录项信息
+            if trace is not None:
+                item_name = _ITEM_NAMES.get(item_prefix, "UNKNOWN")
+                trace.append((_ITEM_LINE, (offset-item_size-1, item_name, item_byte, item_data)))
+            
+            # 处理全局项
+            if item_type == ITEM_TYPE_GLOBAL:
+                handler = _GLOBAL_HANDLERS.get(item_prefix)
+                if handler is not None:
+                    handler(state, item_data)
+                elif trace is not None:
+                    trace.append(("\n", ()))
+            
+            # 处理局部项
+            elif item_type == ITEM_TYPE_LOCAL:
+                handler = _LOCAL_HANDLERS.get(item_prefix)
+                if handler is not None:
+                    handler(state, item_data)
+                elif trace is not None:
+                    trace.append(("\n", ()))
+            
+            # 处理主项
+            elif item_type == ITEM_TYPE_MAIN:
+                if item_tag == 0xA:  # COLLECTION
+                    collection_type = item_data[0] if len(item_data) > 0 else 0
+                    state.collection_depth += 1
+                    if trace is not None:
+                        trace.append((" -> Collection Type: {}\n", (collection_type,)))
+                    # 检查是否是鼠标集合
+                    if state.mouse_usage_count:
+                        state.in_mouse_collection = True
+                        if trace is not None:
+                            for _ in range(state.mouse_usage_count):
+                                trace.append(("    -> Found MOUSE collection!\n", ()))
+                elif item_tag == 0xC:  # END_COLLECTION
+                    state.collection_depth -= 1
+                    if state.collection_depth == 0:
+                        state.in_mouse_collection = False
+                    if trace is not None:
+                        trace.append((" -> End Collection (depth={})\n", (state.collection_depth,)))
+                elif item_tag == 0x8:  # INPUT
+                    flags = decode_uint(item_data)
+                    is_variable = (flags & 0x02) != 0
+                    is_relative = (flags & 0x01) != 0
+                    report_size = state.report_size
+                    report_count = state.report_count
+                    bit_offset = state.current_bit_offset
+                    bit_size = report_size * report_count
                     
-                    # 按钮
-                    if usage_page == PAGE_BUTTON and usage_min >= 1:
-                        if layout['buttons_count'] == 0:
-                            layout['buttons_bit_offset'] = state['current_bit_offset']
-                        if is_variable:
-                            layout['buttons_count'] = max(layout['buttons_count'], state['report_count'])
-                        else:
-                            layout['buttons_count'] = max(layout['buttons_count'], usage_max - usage_min + 1)
-                        print(f"       -> Buttons: offset={layout['buttons_bit_offset']}, count={layout['buttons_count']}")
+                    if trace is not None:
+                        trace.append((" -> INPUT: flags=0x{:02X}, variable={}, relative={}, bit_size={}, bit_offset={}\n",
+                                      (flags, is_variable, is_relative, bit_size, bit_offset)))
                     
-                    # X 轴 - 只要求 variable，不要求 relative
-                    if usage_page == PAGE_GENERIC_DESKTOP and usage_min == USAGE_X and usage_max == USAGE_X:
-                        if is_variable:
-                            layout['x_bit_offset'] = field_bit_offset
-                            layout['x_size'] = state['report_size']
-                            print(f"       -> X axis: offset={layout['x_bit_offset']}, size={layout['x_size']}, is_relative={is_relative}")
+                    # 处理 usages；未出现 REPORT_ID 时首次 INPUT 才创建 report 0 的布局
+                    layout = state.current_layout
+                    if layout is None:
+                        layout = Layout(state.report_id)
+                        state.layouts[state.report_id] = layout
+                        state.current_layout = layout
                     
-                    # Y 轴 - 只要求 variable，不要求 relative
-                    if usage_page == PAGE_GENERIC_DESKTOP and usage_min == USAGE_Y and usage_max == USAGE_Y:
+                    # 处理每个 usage
+                    # 对于 variable 字段，每个 usage 对应 report_count 中的一项，
+                    # 其位偏移为 bit_offset + usage_index * report_size（逐项累加）
+                    usage_index = 0
+                    variable_bit_offset = bit_offset
+                    for usage_page, usage_min, usage_max in state.usages:
+                        if trace is not None:
+                            trace.append(("    -> Processing usage[{}]: Page=0x{:04X}, Range=0x{:04X}-0x{:04X}\n",
+                                          (usage_index, usage_page, usage_min, usage_max)))
+                        
+                        # 计算该 usage 的位偏移
+                        field_bit_offset = bit_offset
+                        if is_variable and usage_index < report_count:
+                            field_bit_offset = variable_bit_offset
+                            if trace is not None:
+                                trace.append(("       -> Variable field: usage_index={}, field_bit_offset={}\n",
+                                              (usage_index, field_bit_offset)))
+                        
+                        # 按钮
+                        if usage_page == PAGE_BUTTON and usage_min >= 1:
+                            if layout.buttons_count == 0:
+                                layout.buttons_bit_offset = bit_offset
+                            if is_variable:
+                                layout.buttons_count = max(layout.buttons_count, report_count)
+                            else:
+                                layout.buttons_count = max(layout.buttons_count, usage_max - usage_min + 1)
+                            if trace is not None:
+                                trace.append(("       -> Buttons: offset={}, count={}\n",
+                                              (layout.buttons_bit_offset, layout.buttons_count)))
+                        
+                        # X/Y 轴、滚轮、平移 - 只要求 variable，不要求 relative
+                        if is_variable and usage_min == usage_max:
+                            field = _FIELD_MAP.get((usage_page, usage_min))
+                            if field is not None:
+                                offset_attr, size_attr, field_name = field
+                                setattr(layout, offset_attr, field_bit_offset)
+                                setattr(layout, size_attr, report_size)
+                                if trace is not None:
+                                    trace.append(("       -> {}: offset={}, size={}, is_relative={}\n",
+                                                  (field_name, field_bit_offset, report_size, is_relative)))
+                        
+                        # 递增 usage_index（仅对 variable 字段）
                         if is_variable:
-                            layout['y_bit_offset'] = field_bit_offset
-                            layout['y_size'] = state['report_size']
-                            print(f"       -> Y axis: offset={layout['y_bit_offset']}, size={layout['y_size']}, is_relative={is_relative}")
+                            usage_index += 1
+                            variable_bit_offset += report_size
                     
-                    # 滚轮 - 只要求 variable
-                    if usage_page == PAGE_GENERIC_DESKTOP and usage_min == USAGE_WHEEL and usage_max == USAGE_WHEEL:
-                        if is_variable:
-                            layout['wheel_bit_offset'] = field_bit_offset
-                            layout['wheel_size'] = state['report_size']
-                            print(f"       -> Wheel: offset={layout['wheel_bit_offset']}, size={layout['wheel_size']}, is_relative={is_relative}")
+                    # 更新位偏移
+                    bit_offset += bit_size
+                    state.current_bit_offset = bit_offset
+                    layout.current_bit_offset = bit_offset
                     
-                    # 平移 - 只要求 variable
-                    if usage_page == PAGE_CONSUMER and usage_min == USAGE_CONSUMER_AC_PAN and usage_max == USAGE_CONSUMER_AC_PAN:
-                        if is_variable:
-                            layout['pan_bit_offset'] = field_bit_offset
-                            layout['pan_size'] = state['report_size']
-                            print(f"       -> Pan: offset={layout['pan_bit_offset']}, size={layout['pan_size']}, is_relative={is_relative}")
-                    
-                    # 递增 usage_index（仅对 variable 字段）
-                    if is_variable:
-                        usage_index += 1
-                
-                # 更新位偏移
-                state['current_bit_offset'] += bit_size
-                layout['current_bit_offset'] = state['current_bit_offset']
-                
-                # 清空 usages
-                state['usages'] = []
-            else:
-                print()
-        else:
-            print()
+                    # 清空 usages
+                    state.usages = []
+                    state.mouse_usage_count = 0
+                elif trace is not None:
+                    trace.append(("\n", ()))
+            elif trace is not None:
+                trace.append(("\n", ()))
+    finally:
+        if verbose:
+            print("=== 解析 HID 描述符 ===\n")
+            _print_trace(trace)
     
-    print("\n=== 解析结果 ===\n")
-    for report_id, layout in sorted(state['layouts'].items()):
-        print(f"Report ID {report_id}:")
-        print(f"  Buttons: offset={layout['buttons_bit_offset']}, count={layout['buttons_count']}")
-        print(f"  X: offset={layout['x_bit_offset']}, size={layout['x_size']}")
-        print(f"  Y: offset={layout['y_bit_offset']}, size={layout['y_size']}")
-        print(f"  Wheel: offset={layout['wheel_bit_offset']}, size={layout['wheel_size']}")
-        print(f"  Pan: offset={layout['pan_bit_offset']}, size={layout['pan_size']}")
-        print(f"  Total bits: {layout['current_bit_offset']}")
-        print()
+    if verbose:
+        _print_layouts(state.layouts)
     
-    return state['layouts']
+    return state.layouts
 
 if __name__ == '__main__':
-    descriptor = parse_hex(descriptor_hex)
+    descriptor = _DESCRIPTOR_BYTES
     print(f"描述符长度: {len(descriptor)} 字节\n")
-    layouts = parse_descriptor(descriptor)
-
+    layouts = parse_descriptor(descriptor, verbose=True)